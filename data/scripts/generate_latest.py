@@ -1,15 +1,31 @@
-import csv
-import json
 import math
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from io import StringIO
+from io import BytesIO
 
-import requests
+import orjson
+import pandas as pd
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
+from urllib3.util.retry import Retry
 
 KST = timezone(timedelta(hours=9))
 
 MY_TICKERS = ["NE","RXRX","BLDP","BMNR","NVDA","TSLA","AI","GGLL","QQQM","VRTL","CEVA","CCS"]
 
+# stooq/fred 반복 요청은 커넥션 재사용 + 디스크 캐시(장 마감 후 일봉은 안 바뀜)
+SESSION = CachedSession(
+    "data/.http_cache.sqlite",
+    expire_after=21600,
+    allowable_methods=["GET"],
+    stale_if_error=True,
+)
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+))
+
 # Stooq: US 종목은 보통 "TICKER.US"
 # 예: AAPL.US / 지수는 ^SPX, ^NDQ, ^DJI / 변동성은 VI.F / 달러인덱스 DX.F / WTI CL.F
 def stooq_symbol(ticker: str) -> str:
@@ -18,7 +34,7 @@ def stooq_symbol(ticker: str) -> str:
         return t
     return f"{t}.US"
 
-def fetch_stooq_daily(symbol: str, days: int = 40):
+def fetch_stooq_daily(symbol: str, days: int = 40, session=SESSION):
     """
     Stooq CSV:
     https://stooq.com/q/d/l/?s=SYMBOL&d1=YYYYMMDD&d2=YYYYMMDD&i=d
@@ -31,26 +47,18 @@ def fetch_stooq_daily(symbol: str, days: int = 40):
     url = "https://stooq.com/q/d/l/"
     params = {"s": symbol, "d1": d1, "d2": d2, "i": "d"}
 
-    r = requests.get(url, params=params, timeout=20)
+    r = session.get(url, params=params, timeout=20)
     r.raise_for_status()
 
     # CSV columns: Date, Open, High, Low, Close, Volume
-    rows = []
-    reader = csv.DictReader(StringIO(r.text))
-    for row in reader:
-        if not row.get("Date") or not row.get("Close"):
-            continue
-        try:
-            rows.append({
-                "date": row["Date"],
-                "close": float(row["Close"]) if row["Close"] not in ("", "nan") else None
-            })
-        except ValueError:
-            continue
-
-    rows = [x for x in rows if x["close"] is not None]
-    rows.sort(key=lambda x: x["date"])
-    return rows[-days:] if len(rows) > days else rows
+    try:
+        df = pd.read_csv(BytesIO(r.content), usecols=["Date", "Close"])
+    except ValueError:
+        # "No data" 같은 비 CSV 응답
+        return []
+    df["Close"] = pd.to_numeric(df["Close"], errors="coerce")
+    df = df.dropna(subset=["Date", "Close"]).sort_values("Date").tail(days)
+    return [{"date": d, "close": c} for d, c in zip(df["Date"].tolist(), df["Close"].tolist())]
 
 def pct_change(last, prev):
     if last is None or prev is None or prev == 0:
@@ -62,27 +70,26 @@ def fmt_price(last: float, digits=2):
         return "-"
     return f"{last:,.{digits}f}"
 
-def fred_last_value(series_id: str, days: int = 60):
+def fred_last_value(series_id: str, days: int = 60, session=SESSION):
     """
     FRED graph CSV (키 없이도 내려받기 가능):
     https://fred.stlouisfed.org/graph/fredgraph.csv?id=SERIES
     """
     url = "https://fred.stlouisfed.org/graph/fredgraph.csv"
-    r = requests.get(url, params={"id": series_id}, timeout=20)
+    r = session.get(url, params={"id": series_id}, timeout=20)
     r.raise_for_status()
-    reader = csv.reader(StringIO(r.text))
-    next(reader, None)  # header
-    data = []
-    for d, v in reader:
-        if v == "." or v == "":
-            continue
-        try:
-            data.append((d, float(v)))
-        except ValueError:
-            continue
-    data.sort(key=lambda x: x[0])
-    tail = data[-days:] if len(data) > days else data
-    return tail
+    df = pd.read_csv(BytesIO(r.content), na_values=["."])
+    df.columns = ["date", "value"]
+    df["value"] = pd.to_numeric(df["value"], errors="coerce")
+    df = df.dropna(subset=["date", "value"]).sort_values("date").tail(days)
+    return list(zip(df["date"].tolist(), df["value"].tolist()))
+
+def safe_fetch(fn, *args):
+    # 병렬 수집 중 내 종목 한 심볼 실패가 전체를 죽이지 않게
+    try:
+        return fn(*args)
+    except Exception:
+        return []
 
 def build_series_labels(values):
     # Chart labels는 최신 30개를 "YYYY-MM-DD"
@@ -92,11 +99,20 @@ def main():
     now_kst = datetime.now(KST)
     updated_at = now_kst.strftime("%Y-%m-%d %H:%M KST")
 
+    # 0) Stooq/FRED는 I/O 대기뿐이라 한 번에 병렬로 받아둠
+    # 지수/금리 실패는 그대로 예외 → run 실패(어제 latest.json 유지), 내 종목만 개별 실패 허용
+    index_syms = ["^SPX", "^NDQ", "^DJI", "VI.F", "DX.F", "CL.F"]
+    with ThreadPoolExecutor(max_workers=16) as ex:
+        dgs10_fut = ex.submit(fred_last_value, "DGS10", 31)
+        index_map = dict(zip(index_syms, ex.map(lambda s: fetch_stooq_daily(s, 31), index_syms)))
+        my_map = dict(zip(MY_TICKERS, ex.map(lambda t: safe_fetch(fetch_stooq_daily, stooq_symbol(t), 10), MY_TICKERS)))
+        dgs10 = dgs10_fut.result()  # (date, value)
+
     # 1) 대표 지수/공포지수
-    spx = fetch_stooq_daily("^SPX", 31)
-    ndq = fetch_stooq_daily("^NDQ", 31)
-    dji = fetch_stooq_daily("^DJI", 31)
-    vix = fetch_stooq_daily("VI.F", 31)
+    spx = index_map["^SPX"]
+    ndq = index_map["^NDQ"]
+    dji = index_map["^DJI"]
+    vix = index_map["VI.F"]
 
     def last_and_change(series):
         last = series[-1]["close"] if series else None
@@ -109,22 +125,19 @@ def main():
     vix_last, vix_chg = last_and_change(vix)
 
     # 2) 매크로: 10Y(FRED), DXY(Stooq), WTI(Stooq)
-    dgs10 = fred_last_value("DGS10", 31)  # (date, value)
     us10y_last = dgs10[-1][1] if dgs10 else None
     us10y_prev = dgs10[-2][1] if len(dgs10) >= 2 else None
     us10y_chg = pct_change(us10y_last, us10y_prev)
 
-    dxy = fetch_stooq_daily("DX.F", 31)
-    wti = fetch_stooq_daily("CL.F", 31)
+    dxy = index_map["DX.F"]
+    wti = index_map["CL.F"]
     dxy_last, dxy_chg = last_and_change(dxy)
     wti_last, wti_chg = last_and_change(wti)
 
     # 3) 내 종목
     my_stocks = []
     for t in MY_TICKERS:
-        sym = stooq_symbol(t)
-        s = fetch_stooq_daily(sym, 10)
-        last, chg = last_and_change(s)
+        last, chg = last_and_change(my_map[t])
         my_stocks.append({
             "symbol": t,
             "name": "",  # 무료로 이름까지 안정적으로 뽑는 건 귀찮아서 비움(원하면 매핑표 넣자)
@@ -200,8 +213,8 @@ def main():
         ]
     }
 
-    with open("data/latest.json", "w", encoding="utf-8") as f:
-        json.dump(out, f, ensure_ascii=False, indent=2)
+    with open("data/latest.json", "wb") as f:
+        f.write(orjson.dumps(out, option=orjson.OPT_INDENT_2))
 
 if __name__ == "__main__":
     main()
@@ -1,12 +1,21 @@
-import json
+import asyncio
+import functools
+import html
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from io import BytesIO
 from pathlib import Path
+from xml.etree.ElementTree import iterparse
 from zoneinfo import ZoneInfo
 
-import requests
-import feedparser
-from bs4 import BeautifulSoup
+import numpy as np
+import orjson
+import pandas as pd
+from requests.adapters import HTTPAdapter
+from requests_cache import DO_NOT_CACHE, CachedSession
+from selectolax.lexbor import LexborHTMLParser
+from urllib3.util.retry import Retry
 from finance_calendars import finance_calendars as fc
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -51,6 +60,28 @@ UA_HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
 }
 
+# 같은 호스트(stooq/fred/...)로 수십 번 요청하므로 커넥션(TLS 핸드셰이크) 재사용.
+# 일봉/DGS10은 장 마감 후 안 바뀌니 디스크 캐시 → 재실행(CI retry, 수동 실행)은 거의 즉시
+HTTP_CACHE = ROOT / "data" / ".http_cache.sqlite"
+SESSION = CachedSession(
+    str(HTTP_CACHE),
+    expire_after=21600,
+    urls_expire_after={
+        "stooq.com": 21600,
+        "fred.stlouisfed.org": 21600,
+        "*": DO_NOT_CACHE,
+    },
+    allowable_methods=["GET"],
+    stale_if_error=True,
+)
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+))
+
+FETCH_WORKERS = 16
+
 ET = ZoneInfo("America/New_York")
 
 BLS_MAJOR_KEYWORDS = [
@@ -69,12 +100,28 @@ BEA_MAJOR_RELEASES = [
     "U.S. International Trade in Goods and Services",
 ]
 
+# 루프 안에서 매번 컴파일하지 않도록 모듈 레벨에 미리
+_TIME_AMPM_RE = re.compile(r"^(\d{1,2}):(\d{2})\s*(AM|PM)$", re.I)
+_BLS_DATE_RE = re.compile(r"^(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday),\s+([A-Za-z]+)\s+(\d{1,2}),\s+(\d{4})$")
+_FED_EVENT_RE = re.compile(r"^([A-Za-z]{3,4}\.\s*\d{1,2}(?:-\d{1,2})?)\s+(.*)$")
+_ICS_EVENT_RE = re.compile(r"BEGIN:VEVENT(.*?)END:VEVENT", re.S)
+_ICS_DTSTART_RE = re.compile(r"^[ \t]*DTSTART[^:\r\n]*:([^\r\n]*)", re.M)
+_ICS_SUMMARY_RE = re.compile(r"^[ \t]*SUMMARY[^:\r\n]*:([^\r\n]*)", re.M)
+_ICS_DT_RE = re.compile(r"(\d{4})(\d{2})(\d{2})T(\d{2})(\d{2})")
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+# 흔한 대문자 단어와 겹치는 티커(AI, CCS=탄소포집, NE ...)는 제목 매칭에서 빼고 개별 조회로
+AMBIGUOUS_TICKERS = {"AI", "CCS", "NE"}
+_TICKER_RES = {
+    t: re.compile(rf"\b{re.escape(t)}\b") for t in MY_TICKERS if t not in AMBIGUOUS_TICKERS
+}
+
 def _parse_time_hhmm_ampm(t: str):
     """
     '08:30 AM' -> (8,30)
     """
     t = (t or "").strip()
-    m = re.match(r"^(\d{1,2}):(\d{2})\s*(AM|PM)$", t, re.I)
+    m = _TIME_AMPM_RE.match(t)
     if not m:
         return None
     hh = int(m.group(1))
@@ -89,65 +136,64 @@ def _parse_time_hhmm_ampm(t: str):
 def _fmt_kst_mmdd_hhmm(dt_kst: datetime) -> str:
     return dt_kst.strftime("%m/%d %H:%M KST")
 
-def fetch_bls_major_events(days: int = 14, limit: int = 8):
+def fetch_bls_major_events(days: int = 14, limit: int = 8, session=SESSION):
     """
     BLS 'Schedule of Selected Releases'에서 다음 N일의 주요 지표(CPI/고용/PPI/JOLTS...)만 뽑아옴.
     시간은 원문이 ET이므로 KST로 변환해 표기.
     """
     url = "https://www.bls.gov/schedule/2026/home.htm"
-    r = requests.get(url, headers=UA_HEADERS, timeout=25)
+    r = session.get(url, headers=UA_HEADERS, timeout=25)
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
+    tree = LexborHTMLParser(r.text)
 
     # 페이지 내 table들을 훑으며 Date/Time/Release 형태의 row를 수집
     items = []
     today_et = datetime.now(ET).date()
     end_et = today_et + timedelta(days=days)
 
-    for table in soup.find_all("table"):
-        for tr in table.find_all("tr"):
-            tds = [td.get_text(" ", strip=True) for td in tr.find_all(["td","th"])]
-            if len(tds) < 3:
-                continue
+    for tr in tree.css("table tr"):
+        tds = [td.text(separator=" ", strip=True) for td in tr.css("td, th")]
+        if len(tds) < 3:
+            continue
 
-            # 보통: [Date, Time, Release] 순
-            date_txt, time_txt, rel_txt = tds[0], tds[1], tds[2]
-            if not date_txt or not rel_txt:
-                continue
+        # 보통: [Date, Time, Release] 순
+        date_txt, time_txt, rel_txt = tds[0], tds[1], tds[2]
+        if not date_txt or not rel_txt:
+            continue
 
-            # 예: "Friday, January 9, 2026"
-            dm = re.match(r"^(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday),\s+([A-Za-z]+)\s+(\d{1,2}),\s+(\d{4})$", date_txt)
-            if not dm:
-                continue
+        # 예: "Friday, January 9, 2026"
+        dm = _BLS_DATE_RE.match(date_txt)
+        if not dm:
+            continue
 
-            month_name = dm.group(2)
-            day = int(dm.group(3))
-            year = int(dm.group(4))
-            try:
-                month = datetime.strptime(month_name, "%B").month
-            except Exception:
-                continue
+        month_name = dm.group(2)
+        day = int(dm.group(3))
+        year = int(dm.group(4))
+        try:
+            month = datetime.strptime(month_name, "%B").month
+        except Exception:
+            continue
 
-            hm = _parse_time_hhmm_ampm(time_txt)
-            if not hm:
-                continue
-            hh, mm = hm
+        hm = _parse_time_hhmm_ampm(time_txt)
+        if not hm:
+            continue
+        hh, mm = hm
 
-            dt_et = datetime(year, month, day, hh, mm, tzinfo=ET)
-            d_et = dt_et.date()
-            if not (today_et <= d_et <= end_et):
-                continue
+        dt_et = datetime(year, month, day, hh, mm, tzinfo=ET)
+        d_et = dt_et.date()
+        if not (today_et <= d_et <= end_et):
+            continue
 
-            # major filter
-            if not any(k.lower() in rel_txt.lower() for k in BLS_MAJOR_KEYWORDS):
-                continue
+        # major filter
+        if not any(k.lower() in rel_txt.lower() for k in BLS_MAJOR_KEYWORDS):
+            continue
 
-            dt_kst = dt_et.astimezone(KST)
-            items.append({
-                "time": _fmt_kst_mmdd_hhmm(dt_kst),
-                "title": rel_txt,
-                "note": "BLS(공식 일정)",
-            })
+        dt_kst = dt_et.astimezone(KST)
+        items.append({
+            "time": _fmt_kst_mmdd_hhmm(dt_kst),
+            "title": rel_txt,
+            "note": "BLS(공식 일정)",
+        })
 
     # 중복 제거 + 시간순 정렬
     uniq = {}
@@ -157,13 +203,13 @@ def fetch_bls_major_events(days: int = 14, limit: int = 8):
     out = sorted(list(uniq.values()), key=lambda x: x["time"])
     return out[:limit]
 
-def fetch_bea_major_events(days: int = 14, limit: int = 8):
+def fetch_bea_major_events(days: int = 14, limit: int = 8, session=SESSION):
     """
     BEA machine-readable schedule(JSON)에서 다음 N일의 주요 이벤트(GDP/Personal Income/Trade)만 뽑아옴.
     BEA JSON은 UTC offset 포함 ISO 문자열이라 fromisoformat()으로 파싱 가능.
     """
     url = "https://apps.bea.gov/API/signup/release_dates.json"
-    r = requests.get(url, headers=UA_HEADERS, timeout=25)
+    r = session.get(url, headers=UA_HEADERS, timeout=25)
     r.raise_for_status()
     raw = r.json()
 
@@ -217,68 +263,136 @@ def fetch_econ_events(limit: int = 8):
 # -----------------------------
 # helpers
 # -----------------------------
-def safe_float(x):
+def stooq_csv(symbol: str, limit: int) -> str:
+    # d1/d2 없이는 수년치 전체 히스토리가 내려옴 → 필요한 최근 구간만 요청
+    end = datetime.now(timezone.utc).date()
+    start = end - timedelta(days=max(limit * 3, 14))  # 주말/휴장 감안 넉넉히
+    return f"https://stooq.com/q/d/l/?s={symbol}&d1={start:%Y%m%d}&d2={end:%Y%m%d}&i=d"
+
+def fetch_stooq_close_series(symbol: str, limit: int = 35, session=SESSION):
+    """
+    returns (labels(tuple[str]), closes(tuple[float]))
+    같은 (symbol, limit)은 run 내 메모리 캐시 → 읽기 전용으로 쓸 것
+    """
+    return _cached_stooq(symbol.lower(), limit, session)
+
+@functools.lru_cache(maxsize=128)
+def _cached_stooq(symbol: str, limit: int, session):
+    url = stooq_csv(symbol, limit)
+    r = session.get(url, headers=UA_HEADERS, timeout=25)
+    r.raise_for_status()
     try:
-        return float(x)
-    except Exception:
-        return None
+        # r.text 디코딩 없이 바이트 그대로 파서에
+        df = pd.read_csv(BytesIO(r.content), usecols=["Date", "Close"])
+    except ValueError:
+        # "No data" 같은 비 CSV 응답
+        return (), ()
+    if len(df) < 2:
+        return (), ()
+    df["Close"] = pd.to_numeric(df["Close"], errors="coerce")
+    df = df.dropna(subset=["Close"]).tail(limit)
+    return tuple(df["Date"].tolist()), tuple(df["Close"].tolist())
+
+def fetch_fred_dgs10(limit: int = 35, session=SESSION):
+    url = "https://fred.stlouisfed.org/graph/fredgraph.csv?id=DGS10"
+    r = session.get(url, headers=UA_HEADERS, timeout=25)
+    r.raise_for_status()
+    # 컬럼명(DATE/observation_date)이 바뀐 적이 있어 위치로 읽음. 값은 이미 percent, 휴장일은 "."
+    df = pd.read_csv(BytesIO(r.content), na_values=["."])
+    df.columns = ["date", "value"]
+    df["value"] = pd.to_numeric(df["value"], errors="coerce")
+    df = df.dropna(subset=["value"]).tail(limit)
+    return df["date"].tolist(), df["value"].tolist()
+
+def batch_changes(series_map, keys):
+    """
+    keys의 (labels, closes)에서 last/prev/pct를 한 번에 계산 -> {key: (last, prev, pct)}
+    종가가 2개 미만이면 (None, None, 0.0). pct는 반올림 전 값.
+    """
+    out = {k: (None, None, 0.0) for k in keys}
+    valid = [k for k in keys if len(series_map[k][1]) >= 2]
+    if not valid:
+        return out
+    closes = np.array([series_map[k][1][-2:] for k in valid], dtype=np.float64)
+    pct = compute_changes(closes)
+    for k, p, l, c in zip(valid, closes[:, 0].tolist(), closes[:, 1].tolist(), pct.tolist()):
+        out[k] = (l, p, c)
+    return out
 
-def pct_change(last, prev):
-    if last is None or prev is None or prev == 0:
-        return 0.0
-    return (last / prev - 1.0) * 100.0
+def compute_changes(closes):
+    """
+    closes: (N, 2) float64 [prev, last] -> (N,) 변동률(%), prev == 0이면 0.0
+    """
+    prev, last = closes[:, 0], closes[:, 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(prev != 0, (last / prev - 1.0) * 100.0, 0.0)
 
-def stooq_csv(symbol: str) -> str:
-    return f"https://stooq.com/q/d/l/?s={symbol}&i=d"
+def top_bot(values):
+    """
+    values -> (argmax, argmin, max, min). 비어 있으면 None
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.size == 0:
+        return None
+    i_max, i_min = int(arr.argmax()), int(arr.argmin())
+    return i_max, i_min, float(arr[i_max]), float(arr[i_min])
 
-def last_prev(arr):
-    if len(arr) < 2:
-        return None, None
-    return arr[-1], arr[-2]
+def align_series(labels, **series):
+    """
+    name=(labels, values) 들을 labels 축으로 정렬 -> {name: [value or None]}
+    """
+    df = pd.DataFrame({
+        k: pd.Series(vals, index=lbls, dtype="float64") for k, (lbls, vals) in series.items()
+    }).reindex(labels)
+    return {k: df[k].astype(object).where(df[k].notna(), None).tolist() for k in df}
 
-def fetch_stooq_close_series(symbol: str, limit: int = 35):
+def fetch_series_parallel(calls, required=()):
     """
-    returns (labels(list[str]), closes(list[float]))
+    calls: {key: (fetch_fn, *args)} -> {key: (labels, values)}
+    I/O 대기뿐이라 스레드로 동시에 받음. 내 종목/섹터는 한 심볼 실패가 전체를 죽이지 않도록 ([], []).
+    required 키(지수/금리 등)는 실패하면 예외 그대로 → run 실패, 어제 latest.json 유지
     """
-    url = stooq_csv(symbol.lower())
-    r = requests.get(url, headers=UA_HEADERS, timeout=25)
-    r.raise_for_status()
-    lines = r.text.strip().splitlines()
-    if len(lines) < 3:
-        return [], []
-    rows = []
-    for line in lines[1:]:
-        parts = line.split(",")
-        if len(parts) < 5:
-            continue
-        dt = parts[0].strip()
-        close = safe_float(parts[4])
-        if close is None:
-            continue
-        rows.append((dt, close))
-    rows = rows[-limit:]
-    return [d for d, _ in rows], [c for _, c in rows]
+    def _run(item):
+        key, (fn, *args) = item
+        try:
+            return fn(*args)
+        except Exception:
+            if key in required:
+                raise
+            return [], []
 
-def fetch_fred_dgs10(limit: int = 35):
-    url = "https://fred.stlouisfed.org/graph/fredgraph.csv?id=DGS10"
-    r = requests.get(url, headers=UA_HEADERS, timeout=25)
-    r.raise_for_status()
-    lines = r.text.strip().splitlines()
-    rows = []
-    for line in lines[1:]:
-        d, v = line.split(",")
-        val = safe_float(v)  # already percent
-        if val is None:
-            continue
-        rows.append((d.strip(), val))
-    rows = rows[-limit:]
-    return [d for d, _ in rows], [v for _, v in rows]
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as ex:
+        return dict(zip(calls, ex.map(_run, calls.items())))
 
 # -----------------------------
 # News (Google News RSS)
 # -----------------------------
 _RSS_CACHE = {}
 
+def _rss_fetch(url: str) -> bytes:
+    # 공유 SESSION 커넥션 풀로 받기 (news.google.com keep-alive 재사용). 캐시는 _RSS_CACHE가 담당
+    r = SESSION.get(url, headers=UA_HEADERS, timeout=20)
+    r.raise_for_status()
+    return r.content
+
+def parse_rss(xml_bytes: bytes, max_items: int = 10):
+    """
+    RSS <item>의 title/description만 스트리밍으로 읽고 max_items개에서 중단
+    returns list[{"title", "summary"}]
+    """
+    items = []
+    for _, el in iterparse(BytesIO(xml_bytes), events=("end",)):
+        if el.tag != "item":
+            continue
+        items.append({
+            "title": el.findtext("title", ""),
+            "summary": el.findtext("description", ""),
+        })
+        el.clear()
+        if len(items) >= max_items:
+            break
+    return items
+
 def google_news_rss(query: str, max_items: int = 10):
     q = query.replace(" ", "+")
     url = f"https://news.google.com/rss/search?q={q}&hl=en-US&gl=US&ceid=US:en"
@@ -287,14 +401,19 @@ def google_news_rss(query: str, max_items: int = 10):
     if url in _RSS_CACHE:
         return _RSS_CACHE[url]
 
-    feed = feedparser.parse(url)
+    try:
+        entries = parse_rss(_rss_fetch(url), max_items)
+    except Exception:
+        # 네트워크 실패/깨진 XML은 빈 결과로
+        return []
     items = []
-    for e in feed.entries[:max_items]:
-        title = getattr(e, "title", "").strip()
+    for e in entries:
+        title = e["title"].strip()
         source = ""
         if " - " in title:
             source = title.split(" - ")[-1].strip()
-        summary = re.sub(r"\s+", " ", re.sub("<[^>]+>", "", getattr(e, "summary", "")).strip())
+        # description은 escape된 HTML 조각(&nbsp; 등) → 태그 제거 후 엔티티 해제
+        summary = _WS_RE.sub(" ", html.unescape(_HTML_TAG_RE.sub("", e["summary"])).strip())
         items.append({
             "title": title,
             "why": summary[:140] + ("…" if len(summary) > 140 else ""),
@@ -302,17 +421,13 @@ def google_news_rss(query: str, max_items: int = 10):
             "star": False,
         })
 
-    # de-dup by title
-    seen = set()
-    out = []
+    # de-dup by title (첫 등장 유지)
+    uniq = {}
     for it in items:
-        key = it["title"].lower()
-        if not key or key in seen:
-            continue
-        seen.add(key)
-        out.append(it)
+        if it["title"]:
+            uniq.setdefault(it["title"].lower(), it)
 
-    out = out[:max_items]
+    out = list(uniq.values())[:max_items]
     _RSS_CACHE[url] = out
     return out
 
@@ -326,16 +441,17 @@ def google_news_one(query: str):
 # -----------------------------
 # Fed schedule (best-effort)
 # -----------------------------
-def fetch_fed_schedule(limit: int = 6):
+def fetch_fed_schedule(limit: int = 6, session=SESSION):
     """
     Best-effort scrape. If breaks, returns [] safely.
     """
     try:
         url = "https://www.federalreserve.gov/monetarypolicy.htm"
-        r = requests.get(url, headers=UA_HEADERS, timeout=25)
+        r = session.get(url, headers=UA_HEADERS, timeout=25)
         r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-        text = soup.get_text("\n")
+        tree = LexborHTMLParser(r.text)
+        tree.strip_tags(["script", "style"])  # bs4 get_text()처럼 스크립트 텍스트 제외
+        text = (tree.body or tree.root).text(separator="\n")
         lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
         try:
             idx = lines.index("Upcoming Dates")
@@ -352,7 +468,7 @@ def fetch_fed_schedule(limit: int = 6):
 
         out = []
         for ev in events[:limit]:
-            m = re.match(r"^([A-Za-z]{3,4}\.\s*\d{1,2}(?:-\d{1,2})?)\s+(.*)$", ev)
+            m = _FED_EVENT_RE.match(ev)
             if m:
                 out.append({"time": m.group(1), "title": m.group(2), "note": "Fed(공식 페이지)"})
             else:
@@ -364,7 +480,7 @@ def fetch_fed_schedule(limit: int = 6):
 # -----------------------------
 # BLS econ calendar (iCal)
 # -----------------------------
-def fetch_bls_schedule(limit: int = 8):
+def fetch_bls_schedule(limit: int = 8, session=SESSION):
     """
     Fetch BLS News Releases iCal and parse VEVENT blocks.
     MVP: timezone conversion omitted; shows YYYY-MM-DD HH:MM as published in ICS.
@@ -372,46 +488,38 @@ def fetch_bls_schedule(limit: int = 8):
     try:
         # page containing .ics link
         page = "https://www.bls.gov/schedule/news_release/ical.htm"
-        r = requests.get(page, headers=UA_HEADERS, timeout=25)
+        r = session.get(page, headers=UA_HEADERS, timeout=25)
         r.raise_for_status()
 
-        soup = BeautifulSoup(r.text, "html.parser")
-        a = soup.select_one('a[href$=".ics"]')
+        tree = LexborHTMLParser(r.text)
+        a = tree.css_first('a[href$=".ics"]')
         if not a:
             return []
 
-        ics_url = a.get("href", "").strip()
+        ics_url = (a.attributes.get("href") or "").strip()
         if not ics_url:
             return []
         if ics_url.startswith("/"):
             ics_url = "https://www.bls.gov" + ics_url
 
-        ics = requests.get(ics_url, headers=UA_HEADERS, timeout=25)
+        ics = session.get(ics_url, headers=UA_HEADERS, timeout=25)
         ics.raise_for_status()
         text = ics.text
 
         # Parse VEVENT blocks
         events = []
-        blocks = text.split("BEGIN:VEVENT")
-        for b in blocks[1:]:
-            if "END:VEVENT" not in b:
-                continue
-            chunk = b.split("END:VEVENT")[0]
-
-            dt = None
-            summary = None
-            for line in chunk.splitlines():
-                line = line.strip()
-                if line.startswith("DTSTART"):
-                    dt = line.split(":", 1)[-1].strip()
-                elif line.startswith("SUMMARY"):
-                    summary = line.split(":", 1)[-1].strip()
+        for ev in _ICS_EVENT_RE.finditer(text):
+            body = ev.group(1)
+            dt_m = _ICS_DTSTART_RE.search(body)
+            sum_m = _ICS_SUMMARY_RE.search(body)
+            dt = dt_m.group(1).strip() if dt_m else None
+            summary = sum_m.group(1).strip() if sum_m else None
 
             if not summary or not dt:
                 continue
 
             # dt example: 20260129T083000
-            m = re.match(r"(\d{4})(\d{2})(\d{2})T(\d{2})(\d{2})", dt)
+            m = _ICS_DT_RE.match(dt)
             if m:
                 y, mo, d, hh, mm = m.groups()
                 time_txt = f"{y}-{mo}-{d} {hh}:{mm}"
@@ -429,134 +537,209 @@ def fetch_bls_schedule(limit: int = 8):
 # -----------------------------
 # Earnings calendar
 # -----------------------------
+def _safe_earnings(d):
+    """
+    하루치 실적 캘린더 -> list[dict]. 실패/이상한 응답이면 []
+    """
+    try:
+        rows = fc.get_earnings_by_date(datetime(d.year, d.month, d.day, 0, 0))
+    except Exception:
+        return []
+
+    # rows가 None/문자열/단일 dict 등으로 올 수도 있어서 방어
+    if isinstance(rows, dict):
+        rows = [rows]
+    if not isinstance(rows, (list, tuple)):
+        return []
+    return [r for r in rows if isinstance(r, dict)]
+
 def build_earnings_next_7days(myset):
     items = []
     today = datetime.now(KST).date()
+    days = [today + timedelta(days=i) for i in range(0, 7)]
 
-    for i in range(0, 7):
-        d = today + timedelta(days=i)
-        try:
-            rows = fc.get_earnings_by_date(datetime(d.year, d.month, d.day, 0, 0))
-        except Exception:
-            rows = []
-
-        # rows가 None/문자열/단일 dict 등으로 올 수도 있어서 방어
-        if rows is None:
-            rows = []
-        if isinstance(rows, dict):
-            rows = [rows]
-        if isinstance(rows, str):
-            rows = []  # 의미 있는 구조가 아니면 버림
-        if not isinstance(rows, (list, tuple)):
-            rows = []
+    # 날짜별 조회는 서로 독립이라 7건 동시에
+    with ThreadPoolExecutor(max_workers=7) as ex:
+        rows_by_day = list(ex.map(_safe_earnings, days))
 
+    for d, rows in zip(days, rows_by_day):
         for r in rows:
-            if not isinstance(r, dict):
-                continue
-            
-            # r이 dict가 아니면 스킵 (str 등)
-            if not isinstance(r, dict):
-                continue
-
+            # 내 종목이 아니면 나머지 필드는 볼 필요 없음
             sym = str(r.get("symbol") or r.get("Symbol") or "").upper().strip()
-            if not sym:
+            if sym not in myset:
                 continue
 
             name = str(r.get("name") or r.get("Name") or "").strip()
             timing = str(r.get("time") or r.get("Time") or r.get("timing") or "").strip()  # BMO/AMC
 
-            if sym in myset:
-                when = f"{d.isoformat()} {timing}".strip()
-                items.append({
-                    "when": when,
-                    "symbol": sym,
-                    "name": name or KO_NAME.get(sym, ""),
-                    "note": "실적 캘린더(Nasdaq)",
-                })
-
-    # dedup: symbol + date
-    seen = set()
-    out = []
+            when = f"{d.isoformat()} {timing}".strip()
+            items.append({
+                "when": when,
+                "symbol": sym,
+                "name": name or KO_NAME.get(sym, ""),
+                "note": "실적 캘린더(Nasdaq)",
+            })
+
+    # dedup: symbol + date (첫 등장 유지)
+    uniq = {}
     for x in items:
-        key = (x["symbol"], x["when"].split()[0])
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(x)
+        uniq.setdefault((x["symbol"], x["when"].split()[0]), x)
 
-    return out[:12]
+    return list(uniq.values())[:12]
 
 # -----------------------------
-# main
+# sections (asyncio DAG)
 # -----------------------------
-def main():
-    now_kst = datetime.now(KST)
-    updated_at = now_kst.strftime("%Y-%m-%d %H:%M KST")
+# I/O는 스레드(asyncio.to_thread)로 동시에 띄우고, 각 섹션은 자기 입력이 도착하는 즉시 가공해
+# JSON용 subdict를 반환. 섹션 간 공유 상태 없이 Task 결과만 주고받음.
+def fetch_quotes():
+    """
+    지수/매크로/내 종목/섹터 시세 -> (series_map, changes)
+    """
+    calls = {
+        "^spx": (fetch_stooq_close_series, "^spx", 35),
+        "^ndq": (fetch_stooq_close_series, "^ndq", 35),
+        "^dji": (fetch_stooq_close_series, "^dji", 35),
+        "vi.f": (fetch_stooq_close_series, "vi.f", 35),
+        "dx.f": (fetch_stooq_close_series, "dx.f", 35),
+        "cl.f": (fetch_stooq_close_series, "cl.f", 35),
+        "DGS10": (fetch_fred_dgs10, 35),
+    }
+    required = set(calls)
+    for t in MY_TICKERS:
+        calls[f"{t.lower()}.us"] = (fetch_stooq_close_series, f"{t.lower()}.us", 2)
+    for etf, _ in SECTOR_ETFS:
+        calls[f"{etf.lower()}.us"] = (fetch_stooq_close_series, f"{etf.lower()}.us", 2)
+    series_map = fetch_series_parallel(calls, required=required)
+
+    # last/prev/변동률은 전 심볼 한 번에 계산
+    return series_map, batch_changes(series_map, list(calls))
+
+def fetch_my_headlines():
+    """
+    news: one headline per ticker (best-effort) -> {ticker: item or None}
+    """
+    # OR 쿼리 한 번으로 받아 제목에 티커가 있는 기사로 나눠 담고, 못 찾은 종목만 개별 조회(병렬)
+    combined = google_news_rss("(" + " OR ".join(MY_TICKERS) + ") stock", max_items=60)
+    headlines = {
+        t: next((it for it in combined if _TICKER_RES[t].search(it["title"])), None)
+        if t in _TICKER_RES else None
+        for t in MY_TICKERS
+    }
+    missing = [t for t in MY_TICKERS if headlines[t] is None]
+    if missing:
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as ex:
+            headlines.update(zip(missing, ex.map(lambda t: google_news_one(f"{t.upper()} stock"), missing)))
+    return headlines
+
+def _us10y_bp(changes):
+    # 금리는 상대%보다 bp를 desc에 넣는게 직관적이라 changePct는 0으로 두는 방식(프론트 fmtPct 그대로 유지)
+    last, prev, _ = changes["DGS10"]
+    return (last - prev) * 100 if (last is not None and prev is not None) else 0
+
+async def build_overnight_section(quotes):
+    series_map, changes = await quotes
 
     # Indices / VIX
-    spx_labels, spx = fetch_stooq_close_series("^spx", 35)
-    ndq_labels, ixic = fetch_stooq_close_series("^ndq", 35)
-    dji_labels, dji = fetch_stooq_close_series("^dji", 35)
-    vix_labels, vix = fetch_stooq_close_series("vi.f", 35)
+    spx_labels, spx = series_map["^spx"]
+    ndq_labels, ixic = series_map["^ndq"]
+    dji_labels, dji = series_map["^dji"]
 
-    spx_last, spx_prev = last_prev(spx)
-    ixic_last, ixic_prev = last_prev(ixic)
-    dji_last, dji_prev = last_prev(dji)
-    vix_last, vix_prev = last_prev(vix)
+    spx_last, _, spx_pct = changes["^spx"]
+    ixic_last, _, ixic_pct = changes["^ndq"]
+    dji_last, _, dji_pct = changes["^dji"]
+    vix_last, _, vix_pct = changes["vi.f"]
 
     overnight_kpis = [
-        {"icon":"📈","label":"S&P500","valueText": f"{spx_last:,.2f}" if spx_last else "-", "desc":"대표 지수", "changePct": round(pct_change(spx_last, spx_prev), 2) if spx_last else 0},
-        {"icon":"📈","label":"나스닥","valueText": f"{ixic_last:,.2f}" if ixic_last else "-", "desc":"기술주 비중", "changePct": round(pct_change(ixic_last, ixic_prev), 2) if ixic_last else 0},
-        {"icon":"📈","label":"다우","valueText": f"{dji_last:,.2f}" if dji_last else "-", "desc":"대형 가치주", "changePct": round(pct_change(dji_last, dji_prev), 2) if dji_last else 0},
-        {"icon":"😱","label":"VIX","valueText": f"{vix_last:,.2f}" if vix_last else "-", "desc":"불안하면 ↑", "changePct": round(pct_change(vix_last, vix_prev), 2) if vix_last else 0},
+        {"icon":"📈","label":"S&P500","valueText": f"{spx_last:,.2f}" if spx_last else "-", "desc":"대표 지수", "changePct": round(spx_pct, 2) if spx_last else 0},
+        {"icon":"📈","label":"나스닥","valueText": f"{ixic_last:,.2f}" if ixic_last else "-", "desc":"기술주 비중", "changePct": round(ixic_pct, 2) if ixic_last else 0},
+        {"icon":"📈","label":"다우","valueText": f"{dji_last:,.2f}" if dji_last else "-", "desc":"대형 가치주", "changePct": round(dji_pct, 2) if dji_last else 0},
+        {"icon":"😱","label":"VIX","valueText": f"{vix_last:,.2f}" if vix_last else "-", "desc":"불안하면 ↑", "changePct": round(vix_pct, 2) if vix_last else 0},
     ]
 
-    # Macro: US10Y (FRED), DXY (DX.F), WTI (CL.F)
-    us10y_labels, us10y = fetch_fred_dgs10(35)
-    dxy_labels, dxy = fetch_stooq_close_series("dx.f", 35)
-    wti_labels, wti = fetch_stooq_close_series("cl.f", 35)
+    # Overnight series (30) aligned by spx_labels
+    ov_labels = spx_labels[-30:] if spx_labels else []
+    overnight_series = {
+        "labels": ov_labels,
+        **align_series(
+            ov_labels,
+            spx=(spx_labels, spx),
+            ixic=(ndq_labels, ixic),
+            dji=(dji_labels, dji),
+        ),
+    }
+
+    return {
+        "overnight": {
+            "kpis": overnight_kpis,
+            "bigFlowReason": "무료 데이터 기반 자동 생성(v2): 지수/변동성/금리/달러/유가 + 내 종목 급등락을 결합",
+            "series": overnight_series,
+        },
+    }
 
-    us10y_last, us10y_prev = last_prev(us10y)
-    dxy_last, dxy_prev = last_prev(dxy)
-    wti_last, wti_prev = last_prev(wti)
+async def build_macro_section(quotes):
+    series_map, changes = await quotes
 
-    # 금리는 상대%보다 bp를 desc에 넣는게 직관적이라 changePct는 0으로 두는 방식(프론트 fmtPct 그대로 유지)
-    us10y_bp = (us10y_last - us10y_prev) * 100 if (us10y_last is not None and us10y_prev is not None) else 0
+    # Macro: US10Y (FRED), DXY (DX.F), WTI (CL.F)
+    spx_labels, _ = series_map["^spx"]
+    us10y_labels, us10y = series_map["DGS10"]
+    dxy_labels, dxy = series_map["dx.f"]
+    wti_labels, wti = series_map["cl.f"]
+
+    us10y_last, _, _ = changes["DGS10"]
+    dxy_last, _, dxy_pct = changes["dx.f"]
+    wti_last, _, wti_pct = changes["cl.f"]
+    us10y_bp = _us10y_bp(changes)
 
     macro_kpis = [
         {"icon":"🏦","label":"미국 10년 금리","valueText": f"{us10y_last:.2f}%" if us10y_last else "-", "desc": f"FRED(DGS10) · 전일 {us10y_bp:+.0f}bp", "changePct": 0},
-        {"icon":"💵","label":"달러값(DXY)","valueText": f"{dxy_last:.2f}" if dxy_last else "-", "desc":"Stooq(DX.F)", "changePct": round(pct_change(dxy_last, dxy_prev), 2) if dxy_last else 0},
-        {"icon":"🛢️","label":"유가(WTI)","valueText": f"{wti_last:.2f}" if wti_last else "-", "desc":"Stooq(CL.F)", "changePct": round(pct_change(wti_last, wti_prev), 2) if wti_last else 0},
+        {"icon":"💵","label":"달러값(DXY)","valueText": f"{dxy_last:.2f}" if dxy_last else "-", "desc":"Stooq(DX.F)", "changePct": round(dxy_pct, 2) if dxy_last else 0},
+        {"icon":"🛢️","label":"유가(WTI)","valueText": f"{wti_last:.2f}" if wti_last else "-", "desc":"Stooq(CL.F)", "changePct": round(wti_pct, 2) if wti_last else 0},
     ]
 
     # align macro labels by us10y labels for chart
     labels = us10y_labels[-30:] if us10y_labels else (spx_labels[-30:] if spx_labels else [])
-    dxy_map = {d: v for d, v in zip(dxy_labels, dxy)}
-    wti_map = {d: v for d, v in zip(wti_labels, wti)}
-    us10y_map = {d: v for d, v in zip(us10y_labels, us10y)}
     macro_series = {
         "labels": labels,
-        "us10y": [us10y_map.get(d) for d in labels],
-        "dxy": [dxy_map.get(d) for d in labels],
-        "wti": [wti_map.get(d) for d in labels],
+        **align_series(
+            labels,
+            us10y=(us10y_labels, us10y),
+            dxy=(dxy_labels, dxy),
+            wti=(wti_labels, wti),
+        ),
     }
 
-    # Earnings (next 7 days, my tickers only)
-    myset = set(MY_TICKERS)
-    upcoming = build_earnings_next_7days(myset)
-    up_map = {u["symbol"]: u["when"] for u in upcoming}
+    return {"macro": {"kpis": macro_kpis, "series": macro_series}}
+
+async def build_news_section():
+    # News Top5 (market)
+    news = await asyncio.to_thread(google_news_rss, "US stock market futures S&P 500", 12)
+    if len(news) < 5:
+        extra = await asyncio.to_thread(google_news_rss, "Nasdaq earnings", 12)
+        news = (news + extra)[:12]
+    return {"newsTop5": news[:5]}
+
+async def build_sectors_section(quotes):
+    _, changes = await quotes
+
+    # Sectors: SPDR sector ETFs
+    sectors = []
+    for etf, ko in SECTOR_ETFS:
+        _, _, pct = changes[f"{etf.lower()}.us"]
+        sectors.append({"name": ko, "changePct": round(pct, 2)})
+    return {"sectors": sectors}
+
+async def build_my_stocks_section(quotes, upcoming, headlines):
+    _, changes = await quotes
+    up_map = {u["symbol"]: u["when"] for u in await upcoming}
+    headlines = await headlines
 
     # My stocks: Stooq ticker.us + add news + nextEvent
     mystocks = []
     for t in MY_TICKERS:
         sym = t.upper()
-        stooq_sym = f"{sym.lower()}.us"
-        try:
-            _, closes = fetch_stooq_close_series(stooq_sym, 3)
-        except Exception:
-            closes = []
-        last, prev = last_prev(closes)
-        chg = round(pct_change(last, prev), 2) if (last is not None and prev is not None) else 0.0
+        last, _, pct = changes[f"{sym.lower()}.us"]
+        chg = round(pct, 2)
         last_txt = f"{last:.2f}" if last is not None else "-"
 
         if last is not None:
@@ -564,8 +747,7 @@ def main():
         else:
             price_text = "-"
 
-        # news: one headline per ticker (best-effort)
-        headline = google_news_one(f"{sym} stock")
+        headline = headlines.get(t)
         news_text = headline["title"] if headline and headline.get("title") else "없음"
 
         next_event = up_map.get(sym, "") or "없음"
@@ -581,17 +763,11 @@ def main():
             "nextEvent": next_event,
             "memo": "",
         })
+    return {"myStocks": mystocks}
 
-    # Sectors: SPDR sector ETFs
-    sectors = []
-    for etf, ko in SECTOR_ETFS:
-        try:
-            _, closes = fetch_stooq_close_series(f"{etf.lower()}.us", 3)
-        except Exception:
-            closes = []
-        last, prev = last_prev(closes)
-        chg = round(pct_change(last, prev), 2) if (last is not None and prev is not None) else 0.0
-        sectors.append({"name": ko, "changePct": chg, "symbol": etf})
+async def build_earnings_section(upcoming, my_stocks):
+    upcoming = await upcoming
+    mystocks = (await my_stocks)["myStocks"]
 
     # p6 Movers: prefer earnings-near tickers (±1 day), then fill with proxy
     today = datetime.now(KST).date()
@@ -625,41 +801,37 @@ def main():
                 "why": "급등락(프록시) — 실적/뉴스 연동 여부 확인",
             })
 
-    # de-dup movers by symbol
-    seen = set()
-    movers2 = []
+    # de-dup movers by symbol (첫 등장 유지)
+    uniq = {}
     for m in movers:
-        if m["symbol"] in seen:
-            continue
-        seen.add(m["symbol"])
-        movers2.append(m)
-    movers = movers2[:10]
+        uniq.setdefault(m["symbol"], m)
+    movers = list(uniq.values())[:10]
 
-    # Schedule
-    fed_events = fetch_fed_schedule(6)
+    return {"earnings": {"upcoming": upcoming, "movers": movers}}
 
-    # ✅ econ: BLS + BEA 공식 일정에서 가져오기
-    econ_events = fetch_econ_events(limit=8)
+async def build_schedule_section(fed, econ, upcoming):
+    fed_events = await fed
+    econ_events = await econ
 
     # 혹시 둘 다 실패하면(네트워크/HTML 변경 등) 최소한의 fallback(내 종목 실적) 유지
     if not econ_events:
         econ_events = []
-        for u in upcoming[:6]:
+        for u in (await upcoming)[:6]:
             econ_events.append({
                 "time": u["when"].split()[0],
                 "title": f"Earnings: {u['symbol']}",
                 "note": u.get("name",""),
             })
 
-    # News Top5 (market)
-    news = google_news_rss("US stock market futures S&P 500", 12)
-    if len(news) < 5:
-        extra = google_news_rss("Nasdaq earnings", 12)
-        news = (news + extra)[:12]
-    news = news[:5]
+    return {"schedule": {"econ": econ_events, "fed": fed_events}}
+
+async def build_summary_section(quotes, my_stocks):
+    _, changes = await quotes
+    mystocks = (await my_stocks)["myStocks"]
 
     # Mood/Action simple rule
-    spx_chg = pct_change(spx_last, spx_prev) if (spx_last is not None and spx_prev is not None) else 0.0
+    _, _, spx_chg = changes["^spx"]
+    vix_last, _, _ = changes["vi.f"]
     vix_val = vix_last if vix_last is not None else None
 
     if spx_chg > 0.5 and (vix_val is None or vix_val < 18):
@@ -673,62 +845,70 @@ def main():
         action = {"value": "관망", "note": "확실한 구간까지 기다리기", "beginnerMemo": "관망도 전략. 애매하면 쉬는 게 이김."}
 
     # One-line summary (include my top/bottom)
-    top = max(mystocks, key=lambda x: x.get("changePct", 0), default=None)
-    bot = min(mystocks, key=lambda x: x.get("changePct", 0), default=None)
+    my_chg = [x.get("changePct", 0) for x in mystocks]
+    tb = top_bot(my_chg)
+    top, bot = (mystocks[tb[0]], mystocks[tb[1]]) if tb else (None, None)
     one_line = (
         f"지수 {('상승' if spx_chg>=0 else '하락')}({spx_chg:+.2f}%), "
-        f"10Y {us10y_bp:+.0f}bp, "
-        f"DXY {pct_change(dxy_last, dxy_prev):+.2f}%, "
-        f"WTI {pct_change(wti_last, wti_prev):+.2f}%. "
+        f"10Y {_us10y_bp(changes):+.0f}bp, "
+        f"DXY {changes['dx.f'][2]:+.2f}%, "
+        f"WTI {changes['cl.f'][2]:+.2f}%. "
         f"내 종목 TOP: {top['symbol']}({top['changePct']:+.2f}%) / "
         f"BOT: {bot['symbol']}({bot['changePct']:+.2f}%)."
         if top and bot else "자동 업데이트: 지수/금리/달러/유가 + 내 종목 변동 반영"
     )
 
     # Risk
-    max_abs = max((abs(x.get("changePct",0)) for x in mystocks), default=0)
+    max_abs = max(abs(tb[2]), abs(tb[3])) if tb else 0
     risk = {
         "speed": f"내 종목 최대 절대등락: {max_abs:.2f}%",
         "vol": f"VIX: {vix_last:.2f}" if vix_last is not None else "VIX: -",
         "rule": f"오늘 액션: {action['value']} (무리 금지)",
     }
 
-    # Overnight series (30) aligned by spx_labels
-    ov_labels = spx_labels[-30:] if spx_labels else []
-    ixic_map = {d: v for d, v in zip(ndq_labels, ixic)}
-    dji_map = {d: v for d, v in zip(dji_labels, dji)}
-    overnight_series = {
-        "labels": ov_labels,
-        "spx": spx[-30:] if spx else [],
-        "ixic": [ixic_map.get(d) for d in ov_labels],
-        "dji": [dji_map.get(d) for d in ov_labels],
-    }
+    return {"oneLine": one_line, "mood": mood, "action": action, "risk": risk}
 
-    payload = {
-        "updatedAt": updated_at,
-        "oneLine": one_line,
-        "mood": mood,
-        "action": action,
-        "overnight": {
-            "kpis": overnight_kpis,
-            "bigFlowReason": "무료 데이터 기반 자동 생성(v2): 지수/변동성/금리/달러/유가 + 내 종목 급등락을 결합",
-            "series": overnight_series,
-        },
-        "schedule": {"econ": econ_events, "fed": fed_events},
-        "macro": {"kpis": macro_kpis, "series": macro_series},
-        "newsTop5": news,
-        "earnings": {"upcoming": upcoming, "movers": movers},
-        "sectors": [{"name": x["name"], "changePct": x["changePct"]} for x in sectors],
-        "myStocks": mystocks,
-        "risk": risk,
-        "todo3": [
-            "내 종목 변동 상위/하위 3개만 따로 체크",
-            "급등/급락 종목은 뉴스 확인 후 대응",
-            "오늘은 ‘한 번만’ 매매 규칙 지키기"
-        ],
-    }
+async def build_payload():
+    updated_at = datetime.now(KST).strftime("%Y-%m-%d %H:%M KST")
+
+    # I/O 리프: 각자 스레드에서 바로 출발
+    quotes = asyncio.create_task(asyncio.to_thread(fetch_quotes))
+    upcoming = asyncio.create_task(asyncio.to_thread(build_earnings_next_7days, set(MY_TICKERS)))
+    headlines = asyncio.create_task(asyncio.to_thread(fetch_my_headlines))
+    fed = asyncio.create_task(asyncio.to_thread(fetch_fed_schedule, 6))
+    # ✅ econ: BLS + BEA 공식 일정에서 가져오기
+    econ = asyncio.create_task(asyncio.to_thread(fetch_econ_events, 8))
+
+    # 다른 섹션이 참조하는 섹션은 Task로 공유
+    my_stocks = asyncio.create_task(build_my_stocks_section(quotes, upcoming, headlines))
+
+    sections = await asyncio.gather(
+        build_summary_section(quotes, my_stocks),
+        build_overnight_section(quotes),
+        build_schedule_section(fed, econ, upcoming),
+        build_macro_section(quotes),
+        build_news_section(),
+        build_earnings_section(upcoming, my_stocks),
+        build_sectors_section(quotes),
+        my_stocks,
+    )
+
+    payload = {"updatedAt": updated_at}
+    for part in sections:
+        payload.update(part)
+    payload["todo3"] = [
+        "내 종목 변동 상위/하위 3개만 따로 체크",
+        "급등/급락 종목은 뉴스 확인 후 대응",
+        "오늘은 ‘한 번만’ 매매 규칙 지키기"
+    ]
+    return payload
 
-    OUT.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+# -----------------------------
+# main
+# -----------------------------
+def main():
+    payload = asyncio.run(build_payload())
+    OUT.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
     print("Wrote:", OUT)
 
 if __name__ == "__main__":